@@ -6,13 +6,15 @@ This version expects:
  - attack.AttackerNode (attack.py) - existing in your project
 """
 
-from flask import Flask, render_template, request
+from flask import Flask, request
 from blockchain import Blockchain
 from attack import AttackerNode
-from config import DEFAULT_CURRENCY, MINING_REWARD, DIFFICULTY
+from config import DEFAULT_CURRENCY, MINING_REWARD, DIFFICULTY, DEBUG
 
 app = Flask(__name__)
-app.config["TEMPLATES_AUTO_RELOAD"] = True
+# Reload edited templates while developing; in production index.html is
+# compiled once below, so template changes need an app restart.
+app.config["TEMPLATES_AUTO_RELOAD"] = DEBUG
 
 # Instantiate blockchain and attacker
 blockchain = Blockchain(difficulty=DIFFICULTY,
@@ -22,6 +24,14 @@ blockchain = Blockchain(difficulty=DIFFICULTY,
 # AttackerNode uses the blockchain instance (attack.py should accept this)
 attacker = AttackerNode(blockchain, hash_power=0.6)
 
+# Outside debug mode, resolve and compile the page template once instead of
+# on every request; in debug mode it is looked up per request so edits show up.
+# Autoescape is off for this page: index.html escapes the user-supplied
+# fields (names, currencies, popup message) explicitly with |e, and the rest
+# of the chain data (indexes, hashes, amounts) never needs escaping.
+INDEX_ENV = app.jinja_env.overlay(autoescape=False)
+INDEX_TEMPLATE = None if DEBUG else INDEX_ENV.get_template("index.html")
+
 
 def render_home(message: str = None, status: str = None):
     """
@@ -31,8 +41,8 @@ def render_home(message: str = None, status: str = None):
     - popup_message/status used by modal
     """
     chain_data = blockchain.to_serializable_chain()
-    return render_template("index.html",
-                           chain=chain_data,
+    template = INDEX_TEMPLATE or INDEX_ENV.get_template("index.html")
+    return template.render(chain=chain_data,
                            blockchain=blockchain,
                            popup_message=message,
                            popup_status=status)
@@ -130,5 +140,5 @@ def add_header(resp):
 
 
 if __name__ == "__main__":
-    # Run debug server for development
-    app.run(host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
+    # Run development server (use wsgi.py with waitress/gunicorn in production)
+    app.run(host="0.0.0.0", port=5000, debug=DEBUG)
\ No newline at end of file
@@ -4,11 +4,25 @@ Attack simulation module for blockchain.
 Implements:
  - Race Attack
  - 51% Attack (majority attack)
+ - Monte-Carlo race simulation (attack success rates without mining)
 """
 
+import os
 import time
 import random
-from blockchain import Blockchain, Block
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+from blockchain import Blockchain, Block, ForkView
+
+
+def _run_fifty_one_attack(args: tuple) -> bool:
+    """
+    Run one 51% attack on a fresh chain (worker of fifty_one_attack_batch).
+    Module-level so ProcessPoolExecutor can pickle it.
+    """
+    hash_power, settings, victim_tx, attacker_tx = args
+    blockchain = Blockchain(**settings)
+    return AttackerNode(blockchain, hash_power).fifty_one_attack(blockchain, victim_tx, attacker_tx)
 
 
 class AttackerNode:
@@ -43,16 +57,21 @@ class AttackerNode:
         """
         print("\n🚨 Starting Race Attack...")
 
+        # The honest chain is only locked while it is read or changed, never
+        # during proof of work, so other threads can keep reading it
         # Honest miner includes victim’s transaction
-        blockchain.pending.append(victim_tx)
+        with blockchain.lock:
+            blockchain.pending.append(victim_tx)
         honest_block = blockchain.mine_pending("HonestMiner")
         print(f"✅ Victim sees transaction included in Block {honest_block.index}")
 
         # Attacker attempts to mine a conflicting transaction
-        attacker_chain = Blockchain(difficulty=blockchain.difficulty,
-                                    reward_amount=blockchain.reward_amount,
-                                    reward_currency=blockchain.reward_currency)
-        attacker_chain.chain = list(blockchain.chain)  # copy honest chain up to this point
+        attacker_chain = Blockchain._empty(difficulty=blockchain.difficulty,
+                                           reward_amount=blockchain.reward_amount,
+                                           reward_currency=blockchain.reward_currency,
+                                           pow_workers=blockchain.pow_workers)
+        with blockchain.lock:
+            attacker_chain.chain = ForkView(blockchain.chain, len(blockchain.chain))  # share honest chain up to this point
         attacker_chain.pending.append(attacker_tx)
 
         fake_block = attacker_chain.mine_pending("Attacker")
@@ -61,7 +80,7 @@ class AttackerNode:
         # Decide which chain wins:
         # If attacker had >50% hash power, they have better chance to win.
         if self.hash_power > 0.5 and random.random() < self.hash_power:
-            blockchain.chain = attacker_chain.chain
+            blockchain.replace_chain(attacker_chain.chain)
             print("💀 Race Attack SUCCESS — attacker’s TX replaced victim’s TX")
             return True
         else:
@@ -71,7 +90,8 @@ class AttackerNode:
     # ------------------------------------------------------------
     # 51% Attack
     # ------------------------------------------------------------
-    def fifty_one_attack(self, blockchain: Blockchain, victim_tx: dict, attacker_tx: dict) -> bool:
+    def fifty_one_attack(self, blockchain: Blockchain, victim_tx: dict, attacker_tx: dict,
+                         simulate_delay: float = 0.0) -> bool:
         """
         Perform a 51% attack (majority attack).
 
@@ -84,27 +104,37 @@ class AttackerNode:
         :param blockchain: Blockchain instance
         :param victim_tx: transaction dict (sender → victim)
         :param attacker_tx: transaction dict (sender → attacker)
+        :param simulate_delay: seconds to pause after each private block (0 = no pause)
         :return: True if attack succeeds, False otherwise
         """
         print("\n🚨 Starting 51% Attack...")
 
+        # The honest chain is only locked while it is read or changed, never
+        # during proof of work or the simulated delays, so other threads can
+        # keep reading (and mining on) it
         # Honest miners confirm victim’s TX
-        blockchain.pending.append(victim_tx)
+        with blockchain.lock:
+            blockchain.pending.append(victim_tx)
         victim_block = blockchain.mine_pending("HonestMiner")
         print(f"✅ Victim sees transaction confirmed in Block {victim_block.index}")
 
         # Attacker secretly starts a private fork
-        attacker_chain = Blockchain(difficulty=blockchain.difficulty,
-                                    reward_amount=blockchain.reward_amount,
-                                    reward_currency=blockchain.reward_currency)
-        attacker_chain.chain = list(blockchain.chain[:-1])  # fork before victim block
+        attacker_chain = Blockchain._empty(difficulty=blockchain.difficulty,
+                                           reward_amount=blockchain.reward_amount,
+                                           reward_currency=blockchain.reward_currency,
+                                           pow_workers=blockchain.pow_workers)
+        with blockchain.lock:
+            attacker_chain.chain = ForkView(blockchain.chain, victim_block.index)  # fork before victim block
+            honest_len = len(blockchain.chain)
         attacker_chain.pending.append(attacker_tx)
 
         private_block = attacker_chain.mine_pending("Attacker")
         print(f"🕵️ Attacker mines private Block {private_block.index}")
 
         # Attacker keeps mining additional private blocks
-        while len(attacker_chain.chain) <= len(blockchain.chain):
+        # (lengths are tracked locally; only the private chain grows here)
+        attacker_len = len(attacker_chain.chain)
+        while attacker_len <= honest_len:
             attacker_chain.pending.append({
                 "sender": "Network",
                 "receiver": "Attacker",
@@ -112,14 +142,76 @@ class AttackerNode:
                 "currency": blockchain.reward_currency
             })
             private_block = attacker_chain.mine_pending("Attacker")
+            attacker_len += 1
             print(f"🕵️ Attacker mines private Block {private_block.index}")
-            time.sleep(0.5)  # simulate time delay
+            if simulate_delay > 0:
+                time.sleep(simulate_delay)  # simulate time delay
+
+        # Replace honest chain if attacker’s is longer than it is now
+        # (honest miners may have extended it meanwhile)
+        with blockchain.lock:
+            if attacker_len > len(blockchain.chain):
+                blockchain.replace_chain(attacker_chain.chain)
+                print("💀 51% Attack SUCCESS — attacker’s chain replaces honest chain!")
+                return True
+            else:
+                print("✅ 51% Attack FAILED — honest chain stayed longer")
+                return False
+
+    def fifty_one_attack_batch(self, victim_tx: dict, attacker_tx: dict, runs: int,
+                               max_workers: int = None) -> List[bool]:
+        """
+        Run `runs` independent 51% attacks in parallel worker processes.
 
-        # Replace honest chain if attacker’s is longer
-        if len(attacker_chain.chain) > len(blockchain.chain):
-            blockchain.chain = attacker_chain.chain
-            print("💀 51% Attack SUCCESS — attacker’s chain replaces honest chain!")
-            return True
-        else:
-            print("✅ 51% Attack FAILED — honest chain stayed longer")
-            return False
\ No newline at end of file
+        Each run gets its own fresh Blockchain with the same settings as
+        self.blockchain, so runs share no state and scale across CPU cores.
+        Mining inside a run stays single-process (the parallelism is across
+        runs).
+
+        :param victim_tx: transaction dict (sender → victim)
+        :param attacker_tx: transaction dict (sender → attacker)
+        :param runs: number of attacks to run
+        :param max_workers: worker processes (default: one per CPU, at most runs)
+        :return: list of attack outcomes (True = attack succeeded)
+        """
+        if runs <= 0:
+            return []
+        settings = {
+            "difficulty": self.blockchain.difficulty,
+            "reward_amount": self.blockchain.reward_amount,
+            "reward_currency": self.blockchain.reward_currency,
+            "pow_workers": 1
+        }
+        if max_workers is None:
+            max_workers = min(runs, os.cpu_count() or 1)
+        jobs = [(self.hash_power, settings, victim_tx, attacker_tx)] * runs
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_run_fifty_one_attack, jobs))
+
+    # ------------------------------------------------------------
+    # Monte-Carlo Race Simulation
+    # ------------------------------------------------------------
+    def simulate_races(self, n: int, hash_power: float = None, confirmations: int = 1,
+                       rng: random.Random = None) -> List[bool]:
+        """
+        Simulate n independent attack races without mining any blocks.
+
+        Idea:
+        - Mining is a race between the attacker (hash power p) and the honest
+          network (q = 1 - p) to produce `confirmations` blocks first.
+        - The attacker's chance of winning is modelled as p^k / (p^k + q^k)
+          for k confirmations, so each race is one Bernoulli draw.
+        - Useful for success-rate metrics where running fifty_one_attack (real
+          PoW per block) n times would be far too slow.
+
+        :param n: number of races to simulate
+        :param hash_power: attacker hash power (defaults to self.hash_power)
+        :param confirmations: blocks the attacker must out-mine (k)
+        :param rng: random.Random to draw from (defaults to the random module)
+        :return: list of n booleans, True where the attacker won
+        """
+        p = self.hash_power if hash_power is None else hash_power
+        p_k = p ** confirmations
+        win_probability = p_k / (p_k + (1 - p) ** confirmations)
+        draw = (rng or random).random
+        return [draw() < win_probability for _ in range(n)]
@@ -11,63 +11,310 @@ Each transaction is a dictionary:
 """
 
 from __future__ import annotations
+import functools
 import hashlib
+import itertools
 import json
+import multiprocessing
+import os
+import queue
+import threading
 import time
-from dataclasses import dataclass
 from typing import List, Dict, Any
-from config import DIFFICULTY, MINING_REWARD, DEFAULT_CURRENCY
+from config import DIFFICULTY, MINING_REWARD, DEFAULT_CURRENCY, POW_WORKERS
 
+# Width of the nonce appended to the block preimage.
+NONCE_SIZE = 8
 
+# Nonces tried between checks of the stop event during parallel PoW
+# (a multiple of 256, see _find_nonce).
+POW_BATCH_SIZE = 4096
+
+# Seconds _mine_parallel waits for a result before checking its workers.
+POW_POLL_INTERVAL = 0.5
+
+# Every possible last byte of a nonce, encoded once for the PoW kernel.
+_LOW_NONCE_BYTES = tuple(bytes([low]) for low in range(256))
+
+# SHA-256 constructor used for all hashing in this module. hashlib's sha256 is
+# OpenSSL's, which already uses the CPU's SHA extensions (x86 SHA-NI, ARMv8
+# SHA2) where available, so no third-party backend is needed.
+_sha256 = hashlib.sha256
+
+# Canonical JSON encoder for block preimages, built once instead of on every
+# json.dumps call. sort_keys keeps serialization stable; compact separators
+# keep the preimage short.
+_PREIMAGE_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), default=str)
+
+
+@functools.lru_cache(maxsize=1024)
 def sha256(data: str) -> str:
-    """Return SHA-256 hex digest for the given string."""
-    return hashlib.sha256(data.encode()).hexdigest()
+    """
+    Return SHA-256 hex digest for the given string.
+    Memoized for callers that hash the same strings repeatedly; block hashing
+    goes through sha256_bytes / the PoW kernel instead.
+    """
+    return _sha256(data.encode()).hexdigest()
+
+
+def sha256_bytes(data: bytes) -> bytes:
+    """Return the raw SHA-256 digest of already-encoded data (no caching)."""
+    return _sha256(data).digest()
+
+
+def tx_hash(tx: Dict[str, Any]) -> bytes:
+    """Raw SHA-256 of a transaction's canonical JSON (a Merkle leaf)."""
+    return sha256_bytes(_PREIMAGE_ENCODER.encode(tx).encode())
+
+
+def _hash_pair(left: bytes, right: bytes) -> bytes:
+    return _sha256(left + right).digest()
+
+
+def compute_merkle_root(leaves: List[bytes]) -> str:
+    """
+    Merkle root (hex) of raw leaf hashes, Bitcoin-style: hash adjacent pairs
+    level by level, duplicating the last node of an odd-sized level.
+    Each level is reduced in one map() call that hashes every even-indexed
+    node with the odd-indexed node after it.
+    """
+    if not leaves:
+        return sha256_bytes(b"").hex()
+    level = list(leaves)
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = list(map(_hash_pair, level[0::2], level[1::2]))
+    return level[0].hex()
+
+
+def _find_nonce(prefix: bytes, start: int, step: int, target: bytes, stop=None):
+    """
+    PoW search kernel shared by the in-process search and the worker processes.
+    Nonces are searched in runs of 256 that share their high NONCE_SIZE - 1
+    bytes: those are absorbed into the SHA-256 state once per run, and each
+    attempt only feeds a precomputed low byte. Runs start, start + step, ...
+    are tried in order. A digest wins if it is <= target
+    (Blockchain._pow_target): one bytes comparison, no slicing.
+
+    Returns (nonce, digest) for the first hit, or None once stop is set. The
+    stop event is polled once per batch rather than on every attempt.
+    """
+    copy_prefix_state = _sha256(prefix).copy
+    batch = step * (POW_BATCH_SIZE // 256)
+    while stop is None or not stop.is_set():
+        for high in range(start, start + batch, step):
+            run_state = copy_prefix_state()
+            run_state.update(high.to_bytes(NONCE_SIZE - 1, "big"))
+            copy_run_state = run_state.copy
+            for low, low_byte in enumerate(_LOW_NONCE_BYTES):
+                attempt = copy_run_state()
+                attempt.update(low_byte)
+                digest = attempt.digest()
+                if digest <= target:
+                    return (high << 8) | low, digest
+        start += batch
+    return None
+
+
+def _pow_worker(prefix: bytes, start: int, step: int, target: bytes,
+                stop, found) -> None:
+    """
+    Entry point of the worker processes started by Blockchain._mine_parallel.
+    Reports its hit on the found queue, then sets stop so the others give up.
+    """
+    result = _find_nonce(prefix, start, step, target, stop)
+    if result is not None:
+        found.put(result)
+        stop.set()
 
 
-@dataclass
 class Block:
-    index: int
-    previous_hash: str
-    timestamp: float
-    transactions: List[Dict[str, Any]]
-    nonce: int = 0
-    hash: str = ""
+    """
+    A mined (or about to be mined) block.
+    Fields live in __slots__ rather than a per-instance __dict__: blocks only
+    ever carry these fields, and a chain plus its forks holds many of them.
+
+    The preimage is always serialized from the current fields, so
+    compute_hash and is_chain_valid notice a block tampered with after
+    mining; only proof_of_work reuses one serialization for a whole search.
+    """
+    _FIELDS = ("index", "previous_hash", "timestamp", "transactions", "nonce", "hash")
+    __slots__ = _FIELDS
+
+    def __init__(self, index: int, previous_hash: str, timestamp: float,
+                 transactions: List[Dict[str, Any]], nonce: int = 0, hash: str = ""):
+        self.index = index
+        self.previous_hash = previous_hash
+        self.timestamp = timestamp
+        self.transactions = transactions
+        self.nonce = nonce
+        self.hash = hash
+
+    def __repr__(self) -> str:
+        return (f"Block(index={self.index!r}, previous_hash={self.previous_hash!r}, "
+                f"timestamp={self.timestamp!r}, transactions={self.transactions!r}, "
+                f"nonce={self.nonce!r}, hash={self.hash!r})")
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self._FIELDS)
+
+    def _preimage_prefix(self) -> bytes:
+        """Serialize every field except the nonce."""
+        block_dict = {
+            "index": self.index,
+            "previous_hash": self.previous_hash,
+            "timestamp": self.timestamp,
+            "transactions": self.transactions
+        }
+        return _PREIMAGE_ENCODER.encode(block_dict).encode()
 
     def compute_hash(self) -> str:
         """
         Compute a deterministic hash of the block's content.
-        Use json.dumps with sort_keys so serialization is stable.
+        The preimage is the serialized block fields followed by the nonce
+        as NONCE_SIZE big-endian bytes.
         """
-        block_dict = {
+        preimage = self._preimage_prefix() + self.nonce.to_bytes(NONCE_SIZE, "big")
+        return sha256_bytes(preimage).hex()
+
+    @property
+    def merkle_root(self) -> str:
+        """Merkle root of the block's transactions, computed from their current contents."""
+        return compute_merkle_root([tx_hash(tx) for tx in self.transactions])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable view of the block (for templates / API)."""
+        return {
             "index": self.index,
             "previous_hash": self.previous_hash,
             "timestamp": self.timestamp,
-            "transactions": self.transactions,
-            "nonce": self.nonce
+            "nonce": self.nonce,
+            "hash": self.hash,
+            "transactions": self.transactions
         }
-        return sha256(json.dumps(block_dict, sort_keys=True, default=str))
+
+
+class ForkView:
+    """
+    A fork of another chain: shares the blocks base[:fork_point] by reference
+    and stores only its own divergent tail. This shares no more than the list
+    copy it replaces, which held the same Block objects by reference; it is
+    safe as long as base is not truncated while the fork is in use. Supports
+    the list operations Blockchain needs (len, indexing, slicing, iteration,
+    append), so it can stand in for Blockchain.chain.
+    """
+    __slots__ = ("base", "fork_point", "tail")
+
+    def __init__(self, base: List[Block], fork_point: int):
+        self.base = base
+        self.fork_point = fork_point
+        self.tail: List[Block] = []
+
+    def __len__(self) -> int:
+        return self.fork_point + len(self.tail)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("fork index out of range")
+        if i < self.fork_point:
+            return self.base[i]
+        return self.tail[i - self.fork_point]
+
+    def __iter__(self):
+        yield from itertools.islice(self.base, self.fork_point)
+        yield from self.tail
+
+    def append(self, block: Block) -> None:
+        self.tail.append(block)
 
 
 class Blockchain:
-    def __init__(self, difficulty: int = DIFFICULTY,
+    def __init__(self, difficulty: int = None,
                  reward_amount: float = MINING_REWARD,
-                 reward_currency: str = DEFAULT_CURRENCY):
+                 reward_currency: str = DEFAULT_CURRENCY,
+                 pow_workers: int = POW_WORKERS,
+                 skip_pow: bool = False):
         """
         Create a new blockchain instance.
 
-        - difficulty: PoW difficulty (number of leading zeros)
+        - difficulty: PoW difficulty (number of leading zeros);
+          defaults to the module-level DIFFICULTY, read at construction time
         - reward_amount: mining reward amount
         - reward_currency: currency code for mining rewards (e.g. USDT)
+        - pow_workers: processes used for the nonce search (0 = one per CPU)
+        - skip_pow: seed the chain with a placeholder genesis block (hash of
+          64 zeros) instead of hashing it; for tests that never check it
         """
+        self._init_state(difficulty, reward_amount, reward_currency, pow_workers)
+        self.create_genesis(skip_pow)
+
+    @classmethod
+    def _empty(cls, difficulty: int = None,
+               reward_amount: float = MINING_REWARD,
+               reward_currency: str = DEFAULT_CURRENCY,
+               pow_workers: int = POW_WORKERS) -> Blockchain:
+        """
+        Create an instance with an empty chain and no genesis block, for
+        callers that install their own chain right away (e.g. attack forks).
+        """
+        blockchain = cls.__new__(cls)
+        blockchain._init_state(difficulty, reward_amount, reward_currency, pow_workers)
+        return blockchain
+
+    def _init_state(self, difficulty: int, reward_amount: float,
+                    reward_currency: str, pow_workers: int) -> None:
+        if difficulty is None:
+            difficulty = DIFFICULTY
+        # Held while the chain, mempool or serialized cache is read-modified-
+        # written, so web server threads can share one instance. Callers doing
+        # multi-step updates (attacks, node.py) take it around the whole step.
+        self.lock = threading.RLock()
         self.difficulty = difficulty
+        self.pow_workers = pow_workers or os.cpu_count() or 1
         self.reward_amount = float(reward_amount)
         self.reward_currency = reward_currency
         self.chain: List[Block] = []
         self.pending: List[Dict[str, Any]] = []  # mempool of tx dicts
-        self.create_genesis()
+        self._serialized_chain: List[Dict[str, Any]] = []  # to_dict() of chain[:len(...)]
 
-    def create_genesis(self) -> None:
-        """Create the genesis block and append to chain."""
+    def __getstate__(self) -> Dict[str, Any]:
+        # Locks cannot be pickled or deep-copied; copies get their own.
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    @property
+    def difficulty(self) -> int:
+        return self._difficulty
+
+    @difficulty.setter
+    def difficulty(self, difficulty: int) -> None:
+        """
+        Set the PoW difficulty and precompute the target checked by the nonce
+        search: the largest 32-byte digest whose first `difficulty` hex digits
+        are zero. Digests compare big-endian as bytes, so a digest meets the
+        difficulty exactly when it is <= this target.
+        """
+        self._difficulty = difficulty
+        self._pow_target = ((1 << (256 - 4 * difficulty)) - 1).to_bytes(32, "big")
+
+    def create_genesis(self, skip_pow: bool = False) -> None:
+        """
+        Create the genesis block and append to chain.
+        With skip_pow the block gets a placeholder hash of 64 zeros instead of
+        its computed hash; blocks mined on top link to it as usual.
+        """
         genesis_tx = {
             "sender": "Network",
             "receiver": "genesis",
@@ -76,8 +323,28 @@ class Blockchain:
         }
         genesis = Block(index=0, previous_hash="0"*64, timestamp=time.time(),
                         transactions=[genesis_tx], nonce=0)
-        genesis.hash = genesis.compute_hash()
-        self.chain.append(genesis)
+        genesis.hash = "0"*64 if skip_pow else genesis.compute_hash()
+        with self.lock:
+            self.chain.append(genesis)
+
+    def replace_chain(self, chain: List[Block]) -> None:
+        """
+        Adopt another chain (e.g. a winning fork) in place of the current one.
+        A ForkView of this chain keeps the shared prefix: the new chain is
+        this chain up to the fork point plus the fork's tail, and the
+        serialized cache keeps its entries for the prefix, so only the
+        divergent blocks are converted. The old list is not truncated, so
+        other forks still being mined on it keep a consistent base.
+        """
+        with self.lock:
+            if isinstance(chain, ForkView):
+                if chain.base is self.chain:
+                    self.chain = self.chain[:chain.fork_point] + chain.tail
+                    self._serialized_chain = self._serialized_chain[:chain.fork_point]
+                    return
+                chain = list(chain)
+            self.chain = chain
+            self._serialized_chain = []
 
     def get_last_block(self) -> Block:
         return self.chain[-1]
@@ -110,72 +377,133 @@ class Blockchain:
             "amount": amt,
             "currency": currency
         }
-        self.pending.append(tx)
+        with self.lock:
+            self.pending.append(tx)
         return tx
 
     def proof_of_work(self, block: Block) -> str:
-        """Simple PoW: find nonce so that hash starts with difficulty zeros."""
-        block.nonce = 0
-        computed = block.compute_hash()
-        target = "0" * self.difficulty
-        while not computed.startswith(target):
-            block.nonce += 1
-            computed = block.compute_hash()
-        return computed
+        """
+        Simple PoW: find nonce so that hash starts with difficulty zeros.
+        Only the nonce changes between attempts, so the rest of the preimage
+        is serialized and absorbed into a SHA-256 state once; each attempt
+        copies that state and feeds just the nonce bytes.
+
+        Attempts are checked on the raw digest against the precomputed
+        _pow_target; only the winning digest is hex-encoded.
+
+        With more than one pow_worker the search is split across processes.
+        """
+        prefix = block._preimage_prefix()
+        if self.pow_workers > 1:
+            block.nonce, digest = self._mine_parallel(prefix, self.pow_workers)
+        else:
+            block.nonce, digest = _find_nonce(prefix, 0, 1, self._pow_target)
+        return digest.hex()
+
+    def _mine_parallel(self, prefix: bytes, nworkers: int) -> tuple:
+        """
+        Search nonces in nworkers processes with disjoint strides:
+        worker k tries the runs of 256 nonces numbered k, k + nworkers, ...
+        Returns (nonce, raw digest) of the first hit reported.
+        :raises: RuntimeError if every worker exits without reporting a hit
+        """
+        stop = multiprocessing.Event()
+        found = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=_pow_worker,
+                                    args=(prefix, k, nworkers, self._pow_target, stop, found),
+                                    daemon=True)
+            for k in range(nworkers)
+        ]
+        try:
+            for worker in workers:
+                worker.start()
+            while True:
+                try:
+                    return found.get(timeout=POW_POLL_INTERVAL)
+                except queue.Empty:
+                    pass
+                if not any(worker.is_alive() for worker in workers):
+                    # A hit put just before its worker exited may still be in flight
+                    try:
+                        return found.get(timeout=POW_POLL_INTERVAL)
+                    except queue.Empty:
+                        exitcodes = [worker.exitcode for worker in workers]
+                        raise RuntimeError(f"All PoW workers exited without a result (exit codes {exitcodes})")
+        finally:
+            stop.set()
+            # If a start failed, only the workers started before it are joined
+            for worker in workers:
+                if worker.pid is not None:
+                    worker.join()
 
     def mine_pending(self, miner_address: str) -> Block:
         """
         Mine a new block including all pending transactions plus the mining reward.
-        After mining, pending pool is cleared.
+        After mining, the mined transactions leave the pending pool.
+        The lock is only held to read the tip and pending pool and to append
+        the mined block, not during proof of work, so other threads can read
+        the chain meanwhile. If another block landed on the tip first, the
+        block is rebuilt on the new tip and mined again; transactions added
+        while mining stay pending.
         """
-        # Copy pending txs to include in block
-        txs = list(self.pending)
+        while True:
+            with self.lock:
+                # Copy pending txs to include in block
+                txs = list(self.pending)
+                tip = self.get_last_block()
+                index = len(self.chain)
+            mined_count = len(txs)
 
-        # Append reward transaction (coinbase)
-        reward_tx = {
-            "sender": "Network",
-            "receiver": miner_address,
-            "amount": float(self.reward_amount),
-            "currency": self.reward_currency
-        }
-        txs.append(reward_tx)
+            # Append reward transaction (coinbase)
+            reward_tx = {
+                "sender": "Network",
+                "receiver": miner_address,
+                "amount": float(self.reward_amount),
+                "currency": self.reward_currency
+            }
+            txs.append(reward_tx)
 
-        new_block = Block(
-            index=len(self.chain),
-            previous_hash=self.get_last_block().hash,
-            timestamp=time.time(),
-            transactions=txs
-        )
+            new_block = Block(
+                index=index,
+                previous_hash=tip.hash,
+                timestamp=time.time(),
+                transactions=txs
+            )
 
-        # Mine
-        new_block.hash = self.proof_of_work(new_block)
+            # Mine
+            new_block.hash = self.proof_of_work(new_block)
 
-        # Append to chain and clear pending mempool
-        self.chain.append(new_block)
-        self.pending = []
-        return new_block
+            # Append to chain and drop the mined txs from the pending mempool
+            with self.lock:
+                if len(self.chain) == index and self.get_last_block() is tip:
+                    self.chain.append(new_block)
+                    self.pending = self.pending[mined_count:]
+                    return new_block
 
     def is_chain_valid(self) -> bool:
         """Validate chain integrity (hashes and links)."""
-        for i in range(1, len(self.chain)):
-            current = self.chain[i]
-            previous = self.chain[i - 1]
-            if current.previous_hash != previous.hash:
-                return False
-            if current.compute_hash() != current.hash:
-                return False
-        return True
+        with self.lock:
+            for i in range(1, len(self.chain)):
+                current = self.chain[i]
+                previous = self.chain[i - 1]
+                if current.previous_hash != previous.hash:
+                    return False
+                if current.compute_hash() != current.hash:
+                    return False
+            return True
 
     # Utility: convert block objects to serializable dicts (for templates / API)
     def to_serializable_chain(self) -> List[Dict[str, Any]]:
-        result = []
-        for b in self.chain:
-            result.append({
-                "index": b.index,
-                "previous_hash": b.previous_hash,
-                "timestamp": b.timestamp,
-                "nonce": b.nonce,
-                "hash": b.hash,
-                "transactions": b.transactions
-            })
-        return result
\ No newline at end of file
+        """
+        Return the chain as a list of block dicts.
+        The block dicts are cached and only the blocks appended since the last
+        call are converted; callers get a shallow copy of the cache, so they
+        can keep or modify it without affecting later calls. replace_chain
+        starts a fresh cache.
+        """
+        with self.lock:
+            serialized = self._serialized_chain
+            for b in self.chain[len(serialized):]:
+                serialized.append(b.to_dict())
+            return list(serialized)
@@ -14,4 +14,13 @@ DIFFICULTY = int(os.getenv("POW_DIFFICULTY", 3))
 MINING_REWARD = float(os.getenv("MINING_REWARD", 15.0))
 
 # Default currency used for mining rewards and default transactions.
-DEFAULT_CURRENCY = os.getenv("DEFAULT_CURRENCY", "USDT")
\ No newline at end of file
+DEFAULT_CURRENCY = os.getenv("DEFAULT_CURRENCY", "USDT")
+
+# Run `python app.py` with Flask's debugger and auto-reloader.
+# Set FLASK_DEBUG=0 (or serve wsgi.py) when measuring performance.
+DEBUG = os.getenv("FLASK_DEBUG", "1") == "1"
+
+# Number of worker processes used for the proof-of-work nonce search.
+# 1 mines in-process; 0 uses one worker per CPU core. Spawning workers costs
+# more than a whole search at low difficulty, so raise this with difficulty.
+POW_WORKERS = int(os.getenv("POW_WORKERS", 1))
@@ -66,7 +66,7 @@ class Node:
             """
             Endpoint to return full blockchain of this node.
             """
-            chain_data = [block.__dict__ for block in self.blockchain.chain]
+            chain_data = self.blockchain.to_serializable_chain()
             return jsonify(chain_data), 200
 
         @self.app.route('/add_block', methods=['POST'])
@@ -77,14 +77,16 @@ class Node:
             block_data = request.get_json()
             block = self.block_from_dict(block_data)
 
-            # Verify block and add if valid
-            if block.previous_hash == self.blockchain.get_last_block().hash:
-                self.blockchain.chain.append(block)
-                return "Block added successfully!", 201
-            else:
-                # If mismatch occurs, trigger chain resolution
-                self.resolve_conflicts()
-                return "Chain resolved", 200
+            # Verify block and add if valid (under the chain lock, so the tip
+            # cannot change between the check and the append)
+            with self.blockchain.lock:
+                if block.previous_hash == self.blockchain.get_last_block().hash:
+                    self.blockchain.chain.append(block)
+                    return "Block added successfully!", 201
+
+            # If mismatch occurs, trigger chain resolution
+            self.resolve_conflicts()
+            return "Chain resolved", 200
 
         @self.app.route('/add_peer', methods=['POST'])
         def add_peer():
@@ -132,7 +134,7 @@ class Node:
         """
         Send newly mined block to all peers.
         """
-        block_data = block.__dict__
+        block_data = block.to_dict()
         for peer in self.peers:
             url = f"{peer}/add_block"
             try:
@@ -162,9 +164,9 @@ class Node:
         if longest_chain:
             # Replace local chain with longest valid peer chain
             from blockchain import Block
-            self.blockchain.chain = [
+            self.blockchain.replace_chain([
                 self.block_from_dict(b) for b in longest_chain
-            ]
+            ])
 
     def validate_chain(self, chain_data):
         """
@@ -177,7 +179,7 @@ class Node:
             chain.append(block)
 
         # Use built-in validation
-        self.blockchain.chain = chain
+        self.blockchain.replace_chain(chain)
         return self.blockchain.is_chain_valid()
 
     def run(self):
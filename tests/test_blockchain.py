@@ -1,8 +1,25 @@
+import hashlib
+import json
+import os
+import random
 import unittest
-from blockchain import Blockchain
+from unittest import mock
+
+# Mine at 1 leading zero (~16 hashes per block) unless the caller asks for
+# more; must be set before config is imported. Tests assert against
+# blockchain.difficulty, never a fixed prefix.
+os.environ.setdefault("POW_DIFFICULTY", "1")
+
+from blockchain import Blockchain, ForkView
 from attack import AttackerNode
 
 
+def _dying_pow_worker(*args):
+    """Stand-in PoW worker that exits without reporting a hit. It is a
+    module-level function so spawn/forkserver can pickle it by name."""
+    os._exit(3)
+
+
 class TestBlockchain(unittest.TestCase):
     """
     Unit tests for Blockchain Simulator
@@ -16,9 +33,11 @@ class TestBlockchain(unittest.TestCase):
       - Transaction history
     """
 
+    # No class-level fixture: with skip_pow a fresh chain costs about as much
+    # as copying a shared one, and keeps every test isolated.
     def setUp(self):
-        """Create a fresh blockchain and attacker before each test."""
-        self.blockchain = Blockchain()
+        """Create a fresh blockchain (placeholder genesis, see skip_pow) and attacker before each test."""
+        self.blockchain = Blockchain(skip_pow=True)
         self.attacker = AttackerNode(self.blockchain, hash_power=0.6)
 
     # --------------------------
@@ -34,10 +53,55 @@ class TestBlockchain(unittest.TestCase):
     # --------------------------
     def test_mine_block(self):
         """Test that mining includes transactions and creates valid block."""
-        self.blockchain.add_transaction("Alice", "Bob", 50)
-        block = self.blockchain.mine_pending("Miner1")
+        blockchain = Blockchain()
+        blockchain.add_transaction("Alice", "Bob", 50)
+        block = blockchain.mine_pending("Miner1")
         self.assertEqual(block.index, 1)  # Genesis block is 0, so mined block is 1
-        self.assertTrue(block.hash.startswith("0" * self.blockchain.difficulty))  # Difficulty check
+        self.assertTrue(block.hash.startswith("0" * blockchain.difficulty))  # Difficulty check
+
+    def test_mine_block_tip_moves_during_pow(self):
+        """Test that a block whose tip moved during PoW is re-mined on the new tip."""
+        blockchain = self.blockchain
+        tx = blockchain.add_transaction("Alice", "Bob", 50)
+        real_pow = blockchain.proof_of_work
+        calls = []
+
+        def racing_pow(block):
+            calls.append(block.index)
+            if len(calls) == 1:
+                blockchain.mine_pending("Miner2")  # another miner lands a block first
+            elif len(calls) == 3:
+                blockchain.add_transaction("Carol", "Dave", 5)  # arrives while mining
+            return real_pow(block)
+
+        with mock.patch.object(blockchain, "proof_of_work", racing_pow):
+            block = blockchain.mine_pending("Miner1")
+
+        self.assertEqual(block.index, 2)
+        self.assertEqual(block.previous_hash, blockchain.chain[1].hash)
+        self.assertIn(tx, blockchain.chain[1].transactions)
+        self.assertNotIn(tx, block.transactions)
+        self.assertEqual([t["sender"] for t in blockchain.pending], ["Carol"])
+        self.assertTrue(blockchain.is_chain_valid())
+
+    # --------------------------
+    # TC02b: Parallel Proof-of-Work
+    # --------------------------
+    def test_mine_block_parallel(self):
+        """Test that splitting the nonce search across processes still meets difficulty."""
+        blockchain = Blockchain(pow_workers=2)
+        blockchain.add_transaction("Alice", "Bob", 50)
+        block = blockchain.mine_pending("Miner1")
+        self.assertTrue(block.hash.startswith("0" * blockchain.difficulty))
+        self.assertEqual(block.hash, block.compute_hash())
+
+    def test_mine_block_parallel_workers_die(self):
+        """Test that parallel mining raises instead of hanging when every worker dies."""
+        blockchain = Blockchain(pow_workers=2)
+        with mock.patch("blockchain._pow_worker", _dying_pow_worker):
+            with self.assertRaises(RuntimeError):
+                blockchain.mine_pending("Miner1")
+        self.assertEqual(len(blockchain.chain), 1)
 
     # --------------------------
     # TC03: Execute 51% Attack
@@ -59,21 +123,70 @@ class TestBlockchain(unittest.TestCase):
         self.blockchain.mine_pending("Miner2")
         self.assertTrue(self.blockchain.is_chain_valid())
 
+    # --------------------------
+    # TC04a: Tamper Detection
+    # --------------------------
+    def test_chain_validity_detects_tampering(self):
+        """Test that editing a mined block's transactions or header invalidates the chain."""
+        self.blockchain.add_transaction("Bob", "Charlie", 30)
+        block = self.blockchain.mine_pending("Miner2")
+        self.assertTrue(self.blockchain.is_chain_valid())
+
+        block.transactions[0]["amount"] = 9999.0
+        self.assertFalse(self.blockchain.is_chain_valid())
+
+        block.transactions[0]["amount"] = 30.0
+        self.assertTrue(self.blockchain.is_chain_valid())
+        block.index = 42
+        self.assertFalse(self.blockchain.is_chain_valid())
+
+    # --------------------------
+    # TC04b: Serialized Chain Cache
+    # --------------------------
+    def test_serializable_chain_tracks_chain(self):
+        """Test that the cached serialized chain follows appends and chain replacement."""
+        self.assertEqual(len(self.blockchain.to_serializable_chain()), 1)
+        block = self.blockchain.mine_pending("Miner2")
+        serialized = self.blockchain.to_serializable_chain()
+        self.assertEqual([b["hash"] for b in serialized], [b.hash for b in self.blockchain.chain])
+        self.assertEqual(serialized[-1], block.to_dict())
+
+        serialized.append("junk")  # callers get a copy, not the cache
+        self.assertEqual(len(self.blockchain.to_serializable_chain()), 2)
+
+        self.blockchain.replace_chain(self.blockchain.chain[:1])
+        self.assertEqual(len(self.blockchain.to_serializable_chain()), 1)
+
+    # --------------------------
+    # TC04c: Fork Adoption
+    # --------------------------
+    def test_fork_view_adoption(self):
+        """Test that a fork shares the honest prefix and replaces only the tail when adopted."""
+        honest_block = self.blockchain.mine_pending("Miner2")
+        fork = Blockchain._empty(difficulty=self.blockchain.difficulty)
+        fork.chain = ForkView(self.blockchain.chain, 1)  # fork before honest_block
+        fork.mine_pending("Attacker")
+        fork.mine_pending("Attacker")
+        self.assertIs(fork.chain[0], self.blockchain.chain[0])
+        self.assertEqual(len(fork.chain), 3)
+
+        self.blockchain.to_serializable_chain()
+        self.blockchain.replace_chain(fork.chain)
+        self.assertIsInstance(self.blockchain.chain, list)
+        self.assertNotIn(honest_block, self.blockchain.chain)
+        self.assertTrue(self.blockchain.is_chain_valid())
+        self.assertEqual([b["hash"] for b in self.blockchain.to_serializable_chain()],
+                         [b.hash for b in self.blockchain.chain])
+
     # --------------------------
     # TC05: Attack Metrics Logging
     # --------------------------
     def test_attack_success_rate(self):
         """Test that attacker succeeds often with 60% hash power."""
-        victim_tx = {"sender": "Alice", "receiver": "Merchant", "amount": 20, "currency": "USDT"}
-        attacker_tx = {"sender": "Alice", "receiver": "Attacker", "amount": 20, "currency": "USDT"}
+        runs = 1000
+        wins = self.attacker.simulate_races(runs, rng=random.Random(1437))
 
-        successes = 0
-        runs = 5
-        for _ in range(runs):
-            if self.attacker.fifty_one_attack(self.blockchain, victim_tx, attacker_tx):
-                successes += 1
-
-        success_rate = successes / runs
+        success_rate = sum(wins) / runs
         self.assertGreater(success_rate, 0.5)
 
     # --------------------------
@@ -82,10 +195,40 @@ class TestBlockchain(unittest.TestCase):
     def test_transaction_history(self):
         """Test that mined block contains transaction history."""
         self.blockchain.add_transaction("Charlie", "Dave", 15)
+        self.blockchain.add_transaction("Dave", "Erin", 5)
         block = self.blockchain.mine_pending("Miner3")
         tx_list = block.transactions
         self.assertGreater(len(tx_list), 0)
 
+        # Reference Merkle root: SHA-256 of each tx's canonical JSON, then
+        # pairwise hashing with the last node duplicated on odd levels
+        level = [hashlib.sha256(json.dumps(tx, sort_keys=True, separators=(",", ":"),
+                                           default=str).encode()).digest()
+                 for tx in tx_list]
+        while len(level) > 1:
+            if len(level) % 2:
+                level.append(level[-1])
+            level = [hashlib.sha256(level[i] + level[i + 1]).digest()
+                     for i in range(0, len(level), 2)]
+        self.assertEqual(block.merkle_root, level[0].hex())
+
+        # The root follows edits to the transactions
+        tx_list[0]["amount"] = 999.0
+        self.assertNotEqual(block.merkle_root, level[0].hex())
+
+    # --------------------------
+    # TC07: Batched 51% Attacks
+    # --------------------------
+    def test_fifty_one_attack_batch(self):
+        """Test that independent 51% attacks dispatched to worker processes succeed."""
+        victim_tx = {"sender": "Alice", "receiver": "Merchant", "amount": 20, "currency": "USDT"}
+        attacker_tx = {"sender": "Alice", "receiver": "Attacker", "amount": 20, "currency": "USDT"}
+
+        runs = 5
+        successes = sum(self.attacker.fifty_one_attack_batch(victim_tx, attacker_tx, runs))
+        self.assertGreater(successes / runs, 0.5)
+        self.assertEqual(self.attacker.fifty_one_attack_batch(victim_tx, attacker_tx, 0), [])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,10 @@
+# wsgi.py
+"""
+Production entry point for the simulator.
+Serve it with a WSGI server instead of the Flask development server:
+    waitress-serve --threads=8 --port=5000 wsgi:app
+The blockchain is held in memory by app.py, so run a single process and
+scale with threads rather than worker processes.
+"""
+
+from app import app